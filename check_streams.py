@@ -1,12 +1,17 @@
 """Utility script to validate IPTV stream URLs in an M3U playlist."""
 
 import argparse
-import concurrent.futures
+import asyncio
+import functools
+import ipaddress
 import pathlib
+import socket
 import sys
-from typing import Iterable, List, Tuple
-from urllib.error import HTTPError, URLError
-from urllib.request import Request, urlopen
+from typing import Dict, Iterable, List, Optional, Tuple
+
+import aiohttp
+from aiohttp.abc import AbstractResolver, ResolveResult
+from yarl import URL
 
 
 def parse_m3u(file_path: pathlib.Path) -> List[str]:
@@ -17,46 +22,150 @@ def parse_m3u(file_path: pathlib.Path) -> List[str]:
     next line.
     """
 
-    urls: List[str] = []
     with file_path.open("r", encoding="utf-8", errors="ignore") as handle:
-        for line in handle:
-            stripped = line.strip()
-            if not stripped or stripped.startswith("#"):
-                continue
-            urls.append(stripped)
-    return urls
+        return [line for line in map(str.strip, handle) if line and line[0] != "#"]
+
 
+class CachingResolver(AbstractResolver):
+    """Resolve each host once per run and share the answer between requests.
 
-def check_url(url: str, timeout: float) -> Tuple[str, bool, int]:
-    """Issue a lightweight request to verify the stream is reachable."""
+    Playlists reference the same few hosts many times, so lookups are keyed on
+    ``(host, family)`` and concurrent callers await a single in-flight query.
+    Answers never expire because the checker is a one-shot script. That
+    includes permanent failures such as a missing domain; only transient
+    ``EAI_AGAIN`` failures are dropped so the next request tries again.
+    """
+
+    def __init__(self, resolver: Optional[AbstractResolver] = None) -> None:
+        # The threaded resolver raises ``socket.gaierror`` with getaddrinfo
+        # codes, which is what tells transient failures from permanent ones.
+        self._resolver = resolver if resolver is not None else aiohttp.ThreadedResolver()
+        self._cache: Dict[Tuple[str, int], "asyncio.Future[List[ResolveResult]]"] = {}
+
+    def _lookup(self, host: str, family: int) -> "asyncio.Future[List[ResolveResult]]":
+        key = (host, family)
+        lookup = self._cache.get(key)
+        if lookup is None:
+            lookup = asyncio.ensure_future(self._resolver.resolve(host, 0, family))
+            lookup.add_done_callback(functools.partial(self._forget_transient_failure, key))
+            self._cache[key] = lookup
+        return lookup
+
+    def prefetch(self, hosts: Iterable[str], family: int) -> None:
+        """Start looking up ``hosts`` in the background without waiting."""
+
+        for host in hosts:
+            self._lookup(host, family)
+
+    async def resolve(
+        self, host: str, port: int = 0, family: socket.AddressFamily = socket.AF_INET
+    ) -> List[ResolveResult]:
+        # Shield the shared lookup so one request timing out does not cancel it
+        # for every other request waiting on the same host.
+        addresses = await asyncio.shield(self._lookup(host, family))
+        return [{**address, "port": port} for address in addresses]
+
+    def _forget_transient_failure(
+        self, key: Tuple[str, int], lookup: "asyncio.Future[List[ResolveResult]]"
+    ) -> None:
+        if lookup.cancelled():
+            transient = True
+        else:
+            error = lookup.exception()
+            transient = error is not None and getattr(error, "errno", None) == socket.EAI_AGAIN
+        if transient and self._cache.get(key) is lookup:
+            del self._cache[key]
+
+    async def close(self) -> None:
+        for lookup in self._cache.values():
+            lookup.cancel()
+        await self._resolver.close()
+
+
+def _lookup_host(url: str) -> Optional[str]:
+    """Return the name aiohttp will resolve for ``url``, if any.
+
+    This is the IDNA-encoded host aiohttp passes to the resolver. IP literals,
+    non-HTTP schemes and URLs that do not parse are skipped because aiohttp
+    never looks them up.
+    """
 
-    request = Request(url, method="GET")
     try:
-        with urlopen(request, timeout=timeout) as response:
-            status = getattr(response, "status", 200)
-            ok = status < 400
-    except HTTPError as exc:
-        status = exc.code
-        ok = False
-    except URLError:
+        parsed = URL(url)
+    except ValueError:
+        return None
+    host = parsed.raw_host
+    if parsed.scheme not in ("http", "https") or not host:
+        return None
+    try:
+        ipaddress.ip_address(host)
+    except ValueError:
+        return host
+    return None
+
+
+async def _request_status(session: aiohttp.ClientSession, method: str, url: str) -> int:
+    """Send ``method`` to ``url`` without reading the body and return the status."""
+
+    # Leaving the context with an unread body closes the socket instead of
+    # returning it to the pool, so endless stream bodies are never drained.
+    async with session.request(method, url, allow_redirects=True) as response:
+        return response.status
+
+
+async def check_url(session: aiohttp.ClientSession, url: str) -> Tuple[str, bool, int]:
+    """Issue a lightweight request to verify the stream is reachable.
+
+    A ``HEAD`` request is sent first so only headers travel over the pooled
+    connection; servers that reject it with 405 are retried with a ``GET``
+    whose body is never read.
+    """
+
+    try:
+        status = await _request_status(session, "HEAD", url)
+        if status == 405:
+            status = await _request_status(session, "GET", url)
+        ok = status < 400
+    except (aiohttp.ClientError, asyncio.TimeoutError, ValueError):
+        # ValueError also covers the UnicodeError raised when a malformed host
+        # such as ``a..b`` or an over-long label cannot be IDNA-encoded.
         status = 0
         ok = False
 
     return url, ok, status if ok else 0
 
 
-def check_urls(urls: Iterable[str], timeout: float, workers: int) -> Tuple[List[str], List[str]]:
+async def check_urls_async(
+    urls: Iterable[str], timeout: float, workers: int
+) -> Tuple[List[str], List[str]]:
     reachable: List[str] = []
     unreachable: List[str] = []
 
-    with concurrent.futures.ThreadPoolExecutor(max_workers=workers) as executor:
-        future_to_url = {executor.submit(check_url, url, timeout): url for url in urls}
-        for future in concurrent.futures.as_completed(future_to_url):
-            url, ok, status = future.result()
-            if ok:
-                reachable.append(f"{url} (status {status})")
-            else:
-                unreachable.append(url)
+    urls = list(urls)
+    # Per-socket timeouts rather than ``total`` so time spent queued for a free
+    # connection slot is not charged against the stream being checked.
+    client_timeout = aiohttp.ClientTimeout(total=None, sock_connect=timeout, sock_read=timeout)
+    resolver = CachingResolver()
+    try:
+        connector = aiohttp.TCPConnector(
+            limit=workers,
+            limit_per_host=8,
+            resolver=resolver,
+            use_dns_cache=False,
+        )
+        # Look up every unique host concurrently in the background. Checks
+        # start straight away and wait on the shared lookup for their host.
+        resolver.prefetch({host for host in map(_lookup_host, urls) if host}, connector.family)
+        async with aiohttp.ClientSession(connector=connector, timeout=client_timeout) as session:
+            results = await asyncio.gather(*(check_url(session, url) for url in urls))
+    finally:
+        await resolver.close()
+
+    for url, ok, status in results:
+        if ok:
+            reachable.append(f"{url} (status {status})")
+        else:
+            unreachable.append(url)
 
     return reachable, unreachable
 
@@ -97,8 +206,17 @@ def main(argv: List[str]) -> int:
         print("No stream URLs found in the playlist.")
         return 1
 
-    print(f"Checking {len(urls)} stream URLs from {args.playlist} ...")
-    reachable, unreachable = check_urls(urls, timeout=args.timeout, workers=args.workers)
+    # Playlists often list the same stream more than once (backup entries,
+    # repeated channel blocks); check each URL only once, keeping file order.
+    unique_urls = list(dict.fromkeys(urls))
+    duplicates = len(urls) - len(unique_urls)
+
+    print(f"Checking {len(unique_urls)} stream URLs from {args.playlist} ...")
+    if duplicates:
+        print(f"Skipped {duplicates} duplicate URLs.")
+    reachable, unreachable = asyncio.run(
+        check_urls_async(unique_urls, timeout=args.timeout, workers=args.workers)
+    )
 
     print(f"\nReachable streams: {len(reachable)}")
     for url in sorted(reachable):
@@ -0,0 +1,149 @@
+import asyncio
+import pathlib
+import socket
+import sys
+from typing import List
+
+import pytest
+
+sys.path.insert(0, str(pathlib.Path(__file__).resolve().parents[1]))
+aiohttp = pytest.importorskip("aiohttp")
+
+from check_streams import CachingResolver, check_url, parse_m3u  # noqa: E402
+
+
+@pytest.mark.parametrize(
+    "url",
+    ["http://a..b/x", f"http://{'a' * 64}.example/x"],
+    ids=["empty-label", "long-label"],
+)
+def test_check_url_reports_unencodable_hosts_as_unreachable(url: str) -> None:
+    async def scenario():
+        async with aiohttp.ClientSession() as session:
+            return await check_url(session, url)
+
+    assert asyncio.run(scenario()) == (url, False, 0)
+
+
+class StubResolver(aiohttp.abc.AbstractResolver):
+    def __init__(self, *errors: Exception) -> None:
+        self.calls: List[str] = []
+        self.errors = list(errors)
+        self.release = asyncio.Event()
+        self.release.set()
+
+    async def resolve(self, host, port=0, family=socket.AF_INET):
+        self.calls.append(host)
+        await self.release.wait()
+        if self.errors:
+            raise self.errors.pop(0)
+        return [
+            {
+                "hostname": host,
+                "host": "192.0.2.1",
+                "port": port,
+                "family": family,
+                "proto": 0,
+                "flags": 0,
+            }
+        ]
+
+    async def close(self) -> None:
+        pass
+
+
+def test_resolver_shares_one_lookup_between_concurrent_callers() -> None:
+    async def scenario():
+        stub = StubResolver()
+        stub.release.clear()
+        resolver = CachingResolver(stub)
+        callers = [resolver.resolve("example.com", 80, socket.AF_INET) for _ in range(3)]
+        pending = asyncio.gather(*callers)
+        await asyncio.sleep(0)
+        stub.release.set()
+        await pending
+        await resolver.resolve("example.com", 80, socket.AF_INET)
+        return stub.calls
+
+    assert asyncio.run(scenario()) == ["example.com"]
+
+
+def test_resolver_retries_transient_failures() -> None:
+    async def scenario():
+        stub = StubResolver(socket.gaierror(socket.EAI_AGAIN, "Temporary failure"))
+        resolver = CachingResolver(stub)
+        with pytest.raises(socket.gaierror):
+            await resolver.resolve("example.com", 80, socket.AF_INET)
+        addresses = await resolver.resolve("example.com", 80, socket.AF_INET)
+        return stub.calls, addresses
+
+    calls, addresses = asyncio.run(scenario())
+    assert calls == ["example.com", "example.com"]
+    assert addresses[0]["host"] == "192.0.2.1"
+
+
+def test_resolver_keeps_permanent_failures() -> None:
+    async def scenario():
+        stub = StubResolver(socket.gaierror(socket.EAI_NONAME, "Name or service not known"))
+        resolver = CachingResolver(stub)
+        for _ in range(2):
+            with pytest.raises(socket.gaierror):
+                await resolver.resolve("example.invalid", 80, socket.AF_INET)
+        return stub.calls
+
+    assert asyncio.run(scenario()) == ["example.invalid"]
+
+
+def test_resolver_cancelled_caller_does_not_cancel_shared_lookup() -> None:
+    async def scenario():
+        stub = StubResolver()
+        stub.release.clear()
+        resolver = CachingResolver(stub)
+        cancelled = asyncio.ensure_future(resolver.resolve("example.com", 80, socket.AF_INET))
+        waiting = asyncio.ensure_future(resolver.resolve("example.com", 80, socket.AF_INET))
+        await asyncio.sleep(0)
+        cancelled.cancel()
+        await asyncio.sleep(0)
+        stub.release.set()
+        addresses = await waiting
+        return cancelled.cancelled(), addresses, stub.calls
+
+    was_cancelled, addresses, calls = asyncio.run(scenario())
+    assert was_cancelled
+    assert addresses[0]["host"] == "192.0.2.1"
+    assert calls == ["example.com"]
+
+
+def test_resolver_returns_addresses_with_callers_port() -> None:
+    async def scenario():
+        resolver = CachingResolver(StubResolver())
+        first = await resolver.resolve("example.com", 80, socket.AF_INET)
+        second = await resolver.resolve("example.com", 8443, socket.AF_INET)
+        return first, second
+
+    first, second = asyncio.run(scenario())
+    assert [address["port"] for address in first] == [80]
+    assert [address["port"] for address in second] == [8443]
+
+
+@pytest.mark.parametrize(
+    "data",
+    [
+        b"#EXTM3U\r#EXTINF:-1,A\rhttp://a/1\r#EXTINF:-1,B\rhttp://b/2\r",
+        b"#EXTM3U\r\n#EXTINF:-1,A\r\nhttp://a/1\r\n#EXTINF:-1,B\r\nhttp://b/2\r\n",
+        b"#EXTM3U\n  #EXTINF:-1,A\n  http://a/1  \n\xc2\xa0#EXTINF:-1,B\nhttp://b/2\n",
+    ],
+    ids=["cr", "crlf", "leading-whitespace"],
+)
+def test_parse_m3u_line_endings_and_comments(tmp_path: pathlib.Path, data: bytes) -> None:
+    playlist = tmp_path / "playlist.m3u"
+    playlist.write_bytes(data)
+
+    assert parse_m3u(playlist) == ["http://a/1", "http://b/2"]
+
+
+def test_parse_m3u_skips_blank_and_undecodable_lines(tmp_path: pathlib.Path) -> None:
+    playlist = tmp_path / "playlist.m3u"
+    playlist.write_bytes(b"#EXTM3U\n\x1c\n\xff\n\t\nhttp://a/1\n")
+
+    assert parse_m3u(playlist) == ["http://a/1"]